@@ -0,0 +1,30 @@
+"""Fit the backend-selection cost model on the ring benchmark workload."""
+
+from __future__ import annotations
+
+import os
+import sys
+
+# Allow running the script directly from the repository root
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from src.explicitctl import ExplicitTransitionSystem
+from src.selector import calibrate, choose_backend
+from run_benchmarks import build_ring
+
+
+def main() -> None:
+    model = calibrate()
+    print("Fitted cost model:")
+    for name, value in vars(model).items():
+        print(f"  {name} = {value:.3g}")
+    print()
+    for n in [20, 200, 1000]:
+        transitions, labeling = build_ring(n)
+        ring = ExplicitTransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init={0})
+        decision = choose_backend(ring, ["AF p"], cost_model=model)
+        print(f"n={n} backend: {decision.backend} ({decision.reason})")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,9 @@ warnings.filterwarnings(
 )
 from lark import Lark, Transformer, v_args
 
+from .optimizer import optimize_formula, shared_subformulas
+from .results import SatisfyingSet
+
 
 class CTLParser(Transformer):
     def start(self, args):
@@ -70,6 +73,10 @@ class CTLParser(Transformer):
         left, right = args
         return ('au', left, right)
 
+    def group(self, args):
+        (child,) = args
+        return child
+
     def atom(self, args):
         token = args[0]
         return ('atom', str(token))
@@ -134,6 +141,7 @@ class TransitionSystem:
         self.var_map = {v: vp for v, vp in zip(self.state_vars, self.next_vars)}
         self.var_map_inv = {vp: v for v, vp in zip(self.state_vars, self.next_vars)}
         self._build_transition_relation()
+        self._build_domain()
 
     def _build_transition_relation(self):
         bdd = self.bdd
@@ -144,6 +152,20 @@ class TransitionSystem:
             T |= cu & cv
         self.T = T
 
+    def _build_domain(self):
+        # Bit patterns encoding IDs below num_states, built as a comparator
+        # from the least significant bit up.
+        bdd = self.bdd
+        lt = bdd.false
+        for i, var in enumerate(self.state_vars):
+            if (self.num_states >> i) & 1:
+                lt = ~bdd.var(var) | lt
+            else:
+                lt = ~bdd.var(var) & lt
+        if self.num_states >= 2 ** self.num_bits:
+            lt = bdd.true
+        self.domain = lt
+
     def state_bdd(self, state: int):
         bdd = self.bdd
         assert 0 <= state < self.num_states
@@ -157,12 +179,21 @@ class TransitionSystem:
                 result &= ~bdd.var(var)
         return result
 
+    def init_bdd(self):
+        result = self.bdd.false
+        for s in self.init:
+            result |= self.state_bdd(s)
+        return result
+
     def _prime(self, node):
         return self.bdd.let(self.var_map, node)
 
     def _unprime(self, node):
         return self.bdd.let(self.var_map_inv, node)
 
+    def atom_names(self) -> Set[str]:
+        return set().union(*self.labeling.values())
+
     def ap_bdd(self, ap: str):
         result = self.bdd.false
         for s in range(self.num_states):
@@ -190,6 +221,10 @@ class CTLModelChecker:
         kind = node[0]
         if kind == 'atom':
             return self.ts.ap_bdd(node[1])
+        if kind == 'true':
+            return self.bdd.true
+        if kind == 'false':
+            return self.bdd.false
         if kind == 'not':
             return ~self.eval(node[1])
         if kind == 'and':
@@ -234,13 +269,21 @@ class CTLModelChecker:
                 return Y
             Y = new
 
-    def satisfies(self, formula):
+    def _evaluate(self, formula, optimize: bool):
         ast = parse_ctl(formula) if isinstance(formula, str) else formula
-        result_bdd = self.eval(ast)
-        init_states = self.bdd.false
-        for s in self.ts.init:
-            init_states |= self.ts.state_bdd(s)
-        return init_states <= result_bdd
+        if not optimize:
+            return self.eval(ast)
+        plan = optimize_formula(ast, self.ts.atom_names())
+        with shared_subformulas(self):
+            return self.eval(plan.ast)
+
+    def sat_set(self, formula, optimize: bool = False) -> SatisfyingSet:
+        """Return the states satisfying ``formula`` as a lazy result."""
+        return SatisfyingSet(self.ts, self._evaluate(formula, optimize))
+
+    def satisfies(self, formula, optimize: bool = False):
+        result_bdd = self._evaluate(formula, optimize)
+        return self.ts.init_bdd() <= result_bdd
 
 
-__all__ = ["TransitionSystem", "CTLModelChecker", "parse_ctl"]
+__all__ = ["TransitionSystem", "CTLModelChecker", "SatisfyingSet", "parse_ctl"]
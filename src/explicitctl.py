@@ -4,6 +4,8 @@ from dataclasses import dataclass
 from typing import Dict, Set, Tuple, List
 
 from .bddctl import parse_ctl
+from .optimizer import optimize_formula, shared_subformulas
+from .results import ExplicitSatisfyingSet
 
 
 @dataclass
@@ -24,6 +26,9 @@ class ExplicitTransitionSystem:
             self.post_map.setdefault(u, set()).add(v)
             self.pre_map.setdefault(v, set()).add(u)
 
+    def atom_names(self) -> Set[str]:
+        return set().union(*self.labeling.values())
+
 
 class ExplicitCTLModelChecker:
     """Explicit-state CTL model checker using Python sets."""
@@ -57,6 +62,10 @@ class ExplicitCTLModelChecker:
         kind = node[0]
         if kind == "atom":
             return {s for s in range(self.ts.num_states) if node[1] in self.ts.labeling.get(s, set())}
+        if kind == "true":
+            return set(range(self.ts.num_states))
+        if kind == "false":
+            return set()
         if kind == "not":
             return set(range(self.ts.num_states)) - self.eval(node[1])
         if kind == "and":
@@ -83,10 +92,21 @@ class ExplicitCTLModelChecker:
             return self._least_fix(lambda Y: self.eval(psi) | (self.eval(phi) & (set(range(self.ts.num_states)) - self.pre(set(range(self.ts.num_states)) - Y))))
         raise ValueError(f"Unknown node kind {kind}")
 
-    def satisfies(self, formula) -> bool:
+    def _evaluate(self, formula, optimize: bool) -> Set[int]:
         ast = parse_ctl(formula) if isinstance(formula, str) else formula
-        result = self.eval(ast)
+        if not optimize:
+            return self.eval(ast)
+        plan = optimize_formula(ast, self.ts.atom_names())
+        with shared_subformulas(self):
+            return self.eval(plan.ast)
+
+    def sat_set(self, formula, optimize: bool = False) -> ExplicitSatisfyingSet:
+        """Return the states satisfying ``formula`` as a result object."""
+        return ExplicitSatisfyingSet(self.ts, self._evaluate(formula, optimize))
+
+    def satisfies(self, formula, optimize: bool = False) -> bool:
+        result = self._evaluate(formula, optimize)
         return self.ts.init <= result
 
 
-__all__ = ["ExplicitTransitionSystem", "ExplicitCTLModelChecker"]
+__all__ = ["ExplicitTransitionSystem", "ExplicitCTLModelChecker", "ExplicitSatisfyingSet"]
@@ -0,0 +1,208 @@
+"""On-the-fly local CTL model checking.
+
+:class:`LocalCTLModelChecker` never enumerates the state space.  It is given
+the initial states and two callbacks, ``successors(state)`` and
+``labels(state)``, and decides formulas one state at a time.  States are
+explored depth-first only as far as a verdict needs, per-state verdicts are
+memoized per subformula, and :meth:`LocalCTLModelChecker.satisfies` stops as
+soon as the initial states are decided.  Memory grows with the explored
+fragment, not with the size of the system.
+
+Formulas are first rewritten by :func:`~src.optimizer.optimize_formula` into
+the EX/EU/EG basis, so AF, AU, AG and AX are handled through their
+existential duals:
+
+* ``E[φ U ψ]`` searches the φ-states reachable from the state for a ψ-state;
+  the DFS path to it is then a witness and every state on it holds.
+* ``EG φ`` searches the φ-states for a cycle, i.e. a nontrivial strongly
+  connected component, detected as an edge back into the open part of the
+  search; the stack is then a lasso witness and every state on it holds.
+
+States are decided false as soon as their part of the search is finished,
+so later searches from other states never re-explore them.  For EU that is
+when a whole strongly connected component is finished (Tarjan's
+bookkeeping): a state that can reach an ancestor still on the stack is
+undecided until that ancestor is.  For EG any such edge already closes a
+cycle, so a state is false as soon as it is backtracked from.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Set, Tuple
+
+from .bddctl import parse_ctl
+from .optimizer import hash_cons, optimize_formula
+
+_DONE = object()
+
+
+class LocalCTLModelChecker:
+    """Demand-driven explicit CTL model checker over implicit state spaces."""
+
+    def __init__(
+        self,
+        init: Iterable[Hashable],
+        successors: Callable[[Any], Iterable[Hashable]],
+        labels: Callable[[Any], Set[str]],
+    ) -> None:
+        self.init = list(init)
+        self.successors = successors
+        self.labels = labels
+        self._succ_cache: Dict[Hashable, List[Hashable]] = {}
+        # Subformulas are interned across calls, so verdicts are keyed on
+        # id(node); the node is stored alongside to keep its id alive.
+        self._nodes: Dict[Any, Any] = {}
+        self._memo: Dict[int, Tuple[Any, Dict[Hashable, bool]]] = {}
+
+    @property
+    def explored_states(self) -> int:
+        """Number of states whose successors have been requested."""
+        return len(self._succ_cache)
+
+    def _succ(self, state) -> List[Hashable]:
+        succ = self._succ_cache.get(state)
+        if succ is None:
+            succ = self._succ_cache[state] = list(self.successors(state))
+        return succ
+
+    def _prepare(self, formula):
+        ast = parse_ctl(formula) if isinstance(formula, str) else formula
+        return hash_cons(optimize_formula(ast).ast, self._nodes)
+
+    # ------ CTL evaluation ------
+    def _holds(self, node, state) -> bool:
+        entry = self._memo.get(id(node))
+        if entry is None:
+            entry = self._memo[id(node)] = (node, {})
+        memo = entry[1]
+        if state in memo:
+            return memo[state]
+        kind = node[0]
+        if kind == "true":
+            result = True
+        elif kind == "false":
+            result = False
+        elif kind == "atom":
+            result = node[1] in self.labels(state)
+        elif kind == "not":
+            result = not self._holds(node[1], state)
+        elif kind == "and":
+            result = self._holds(node[1], state) and self._holds(node[2], state)
+        elif kind == "or":
+            result = self._holds(node[1], state) or self._holds(node[2], state)
+        elif kind == "ex":
+            result = any(self._holds(node[1], t) for t in self._succ(state))
+        elif kind == "eu":
+            return self._eu(node, state, memo)
+        elif kind == "eg":
+            return self._eg(node, state, memo)
+        else:
+            raise ValueError(f"Unknown node kind {kind}")
+        memo[state] = result
+        return result
+
+    def _eu(self, node, root, memo) -> bool:
+        phi, psi = node[1], node[2]
+
+        def status(s):
+            if s in memo:
+                return memo[s]
+            if self._holds(psi, s):
+                memo[s] = True
+                return True
+            if not self._holds(phi, s):
+                memo[s] = False
+                return False
+            return None
+
+        verdict = status(root)
+        if verdict is not None:
+            return verdict
+        path = [root]
+        iters = [iter(self._succ(root))]
+        index = {root: 0}
+        low = {root: 0}
+        component = [root]
+        open_states = {root}
+        while path:
+            t = next(iters[-1], _DONE)
+            if t is _DONE:
+                s = path.pop()
+                iters.pop()
+                if low[s] == index[s]:
+                    while True:
+                        u = component.pop()
+                        open_states.discard(u)
+                        memo[u] = False
+                        if u == s:
+                            break
+                if path:
+                    low[path[-1]] = min(low[path[-1]], low[s])
+                continue
+            if t in index:
+                if t in open_states:
+                    low[path[-1]] = min(low[path[-1]], index[t])
+                continue
+            index[t] = low[t] = len(index)
+            verdict = status(t)
+            if verdict:
+                for s in path:
+                    memo[s] = True
+                return True
+            if verdict is None:
+                path.append(t)
+                component.append(t)
+                open_states.add(t)
+                iters.append(iter(self._succ(t)))
+        return False
+
+    def _eg(self, node, root, memo) -> bool:
+        phi = node[1]
+
+        def status(s):
+            if s in memo:
+                return memo[s]
+            if not self._holds(phi, s):
+                memo[s] = False
+                return False
+            return None
+
+        verdict = status(root)
+        if verdict is not None:
+            return verdict
+        path = [root]
+        on_path = {root}
+        iters = [iter(self._succ(root))]
+        while path:
+            t = next(iters[-1], _DONE)
+            if t is _DONE:
+                s = path.pop()
+                on_path.discard(s)
+                iters.pop()
+                memo[s] = False
+                continue
+            if t in on_path:
+                for s in path:
+                    memo[s] = True
+                return True
+            verdict = status(t)
+            if verdict:
+                for s in path:
+                    memo[s] = True
+                return True
+            if verdict is None:
+                path.append(t)
+                on_path.add(t)
+                iters.append(iter(self._succ(t)))
+        return False
+
+    def holds(self, formula, state) -> bool:
+        """Decide ``formula`` at a single ``state``."""
+        return self._holds(self._prepare(formula), state)
+
+    def satisfies(self, formula) -> bool:
+        ast = self._prepare(formula)
+        return all(self._holds(ast, s) for s in self.init)
+
+
+__all__ = ["LocalCTLModelChecker"]
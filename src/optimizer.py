@@ -0,0 +1,277 @@
+"""CTL formula optimizer.
+
+:func:`optimize_formula` rewrites an AST produced by
+:func:`~src.bddctl.parse_ctl` before it is evaluated:
+
+* universal operators are expressed in the existential basis EX, EU, EG
+  (``EF φ`` becomes ``E[true U φ]``) and negations are pushed through the
+  boolean connectives, cancelling double complements;
+* idempotent temporal operators collapse (``E[φ U E[φ U ψ]]`` to
+  ``E[φ U ψ]``, ``EG EG φ`` to ``EG φ``), which also covers ``EF EF``,
+  ``AG AG`` and ``AF AF`` once normalized;
+* ``true``/``false`` are folded, including atoms that no state is labeled
+  with;
+* structurally equal subformulas are shared, and :func:`shared_subformulas`
+  lets a checker evaluate each of them once.
+
+Shared nodes are compared by identity, never by hashing: a tuple hash walks
+the whole subtree, and on a DAG that is exponential in its depth.
+:func:`hash_cons` shares equal subtrees of formulas that were not optimized.
+
+The result reports how many fixpoint computations were eliminated.  It can be
+negative: ``A[φ U ψ]`` needs both an EU and an EG in the existential basis.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable
+
+TRUE = ('true',)
+FALSE = ('false',)
+
+_FIXPOINTS = ('ef', 'af', 'eg', 'ag', 'eu', 'au')
+
+
+@dataclass
+class OptimizationResult:
+    """Rewritten formula and fixpoint counts.
+
+    ``fixpoints_before`` counts fixpoint occurrences in the input tree,
+    which is what the unoptimized evaluator computes: a repeated subformula
+    is computed once per occurrence.  ``fixpoints_after`` counts distinct
+    fixpoint nodes of the rewritten DAG, which is what evaluation under
+    :func:`shared_subformulas` computes.  ``fixpoints_eliminated`` therefore
+    includes savings from sharing as well as from rewriting.
+    """
+
+    ast: Any
+    fixpoints_before: int
+    fixpoints_after: int
+
+    @property
+    def fixpoints_eliminated(self) -> int:
+        return self.fixpoints_before - self.fixpoints_after
+
+
+def count_fixpoints(ast) -> int:
+    """Number of fixpoint nodes the unoptimized evaluator computes."""
+    return (ast[0] in _FIXPOINTS) + sum(
+        count_fixpoints(child) for child in ast[1:] if isinstance(child, tuple)
+    )
+
+
+def _count_distinct_fixpoints(ast) -> int:
+    # The rewritten formula is hash-consed, so identity is equality.
+    seen = {}
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen[id(node)] = node
+        stack.extend(child for child in node[1:] if isinstance(child, tuple))
+    return sum(1 for node in seen.values() if node[0] in _FIXPOINTS)
+
+
+class _Rewriter:
+    """Bottom-up rewriter over hash-consed nodes.
+
+    Every node it returns is canonical: children are interned before their
+    parent, so the intern table is keyed on child identities and node
+    equality is an identity test.  Each node also gets a creation index,
+    used to order commutative operands without walking subtrees.
+    """
+
+    def __init__(self, atoms) -> None:
+        self.atoms = None if atoms is None else set(atoms)
+        self.table: Dict[Any, Any] = {}
+        self.index: Dict[int, int] = {}
+        self.intern(TRUE)
+        self.intern(FALSE)
+
+    def intern(self, node):
+        key = (node[0],) + tuple(id(c) if isinstance(c, tuple) else c for c in node[1:])
+        found = self.table.get(key)
+        if found is None:
+            found = self.table[key] = node
+            self.index[id(node)] = len(self.index)
+        return found
+
+    def _ordered(self, a, b):
+        return (a, b) if self.index[id(a)] <= self.index[id(b)] else (b, a)
+
+    def _complementary(self, a, b) -> bool:
+        return (a[0] == 'not' and a[1] is b) or (b[0] == 'not' and b[1] is a)
+
+    # ------ smart constructors ------
+    def neg(self, x):
+        if x is TRUE:
+            return FALSE
+        if x is FALSE:
+            return TRUE
+        if x[0] == 'not':
+            return x[1]
+        if x[0] == 'and':
+            return self.or_(self.neg(x[1]), self.neg(x[2]))
+        if x[0] == 'or':
+            return self.and_(self.neg(x[1]), self.neg(x[2]))
+        return self.intern(('not', x))
+
+    def and_(self, a, b):
+        if a is FALSE or b is FALSE:
+            return FALSE
+        if a is TRUE:
+            return b
+        if b is TRUE or a is b:
+            return a
+        if self._complementary(a, b):
+            return FALSE
+        return self.intern(('and',) + self._ordered(a, b))
+
+    def or_(self, a, b):
+        if a is TRUE or b is TRUE:
+            return TRUE
+        if a is FALSE:
+            return b
+        if b is FALSE or a is b:
+            return a
+        if self._complementary(a, b):
+            return TRUE
+        return self.intern(('or',) + self._ordered(a, b))
+
+    def ex(self, x):
+        if x is FALSE:
+            return FALSE
+        return self.intern(('ex', x))
+
+    def eu(self, a, b):
+        if b is FALSE or b is TRUE:
+            return b
+        if a is FALSE or a is b:
+            return b
+        if b[0] == 'eu' and b[1] is a:
+            return b
+        return self.intern(('eu', a, b))
+
+    def eg(self, x):
+        if x is FALSE:
+            return FALSE
+        if x[0] == 'eg':
+            return x
+        return self.intern(('eg', x))
+
+    # ------ translation ------
+    def rewrite(self, node):
+        kind = node[0]
+        if kind == 'true':
+            return TRUE
+        if kind == 'false':
+            return FALSE
+        if kind == 'atom':
+            if self.atoms is not None and node[1] not in self.atoms:
+                return FALSE
+            return self.intern(node)
+        if kind == 'not':
+            return self.neg(self.rewrite(node[1]))
+        if kind == 'and':
+            return self.and_(self.rewrite(node[1]), self.rewrite(node[2]))
+        if kind == 'or':
+            return self.or_(self.rewrite(node[1]), self.rewrite(node[2]))
+        if kind == 'ex':
+            return self.ex(self.rewrite(node[1]))
+        if kind == 'ax':
+            return self.neg(self.ex(self.neg(self.rewrite(node[1]))))
+        if kind == 'ef':
+            return self.eu(TRUE, self.rewrite(node[1]))
+        if kind == 'ag':
+            return self.neg(self.eu(TRUE, self.neg(self.rewrite(node[1]))))
+        if kind == 'eg':
+            return self.eg(self.rewrite(node[1]))
+        if kind == 'af':
+            return self.neg(self.eg(self.neg(self.rewrite(node[1]))))
+        if kind == 'eu':
+            return self.eu(self.rewrite(node[1]), self.rewrite(node[2]))
+        if kind == 'au':
+            phi, psi = self.rewrite(node[1]), self.rewrite(node[2])
+            not_psi = self.neg(psi)
+            return self.neg(self.or_(
+                self.eu(not_psi, self.and_(self.neg(phi), not_psi)),
+                self.eg(not_psi),
+            ))
+        raise ValueError(f"Unknown node kind {kind}")
+
+
+def hash_cons(ast, table: Dict[Any, Any] | None = None):
+    """Return ``ast`` with structurally equal subtrees replaced by one node.
+
+    Pass the same ``table`` for several formulas to share nodes between them.
+    """
+    table = {} if table is None else table
+    done: Dict[int, Any] = {}
+
+    def visit(node):
+        found = done.get(id(node))
+        if found is None:
+            children = tuple(visit(c) if isinstance(c, tuple) else c for c in node[1:])
+            key = (node[0],) + tuple(id(c) if isinstance(c, tuple) else c for c in children)
+            found = table.get(key)
+            if found is None:
+                found = table[key] = (node[0],) + children
+            done[id(node)] = found
+        return found
+
+    return visit(ast)
+
+
+def optimize_formula(ast, atoms: Iterable[str] | None = None) -> OptimizationResult:
+    """Rewrite ``ast`` into an equivalent, cheaper formula.
+
+    ``atoms`` are the proposition names that label at least one state; any
+    other atom is folded to ``false``.  Pass ``None`` to skip that folding.
+    """
+    optimized = _Rewriter(atoms).rewrite(ast)
+    return OptimizationResult(
+        ast=optimized,
+        fixpoints_before=count_fixpoints(ast),
+        fixpoints_after=_count_distinct_fixpoints(optimized),
+    )
+
+
+@contextmanager
+def shared_subformulas(checker):
+    """Memoize ``checker.eval`` per subformula node inside the block.
+
+    Without this, a fixpoint re-evaluates its operands on every iteration.
+    Nodes are keyed by identity, so equal subformulas share a result only if
+    they are the same object, as they are after :func:`optimize_formula` or
+    :func:`hash_cons`.  Nested uses share the outermost memo.
+    """
+    if 'eval' in vars(checker):
+        yield checker
+        return
+    # id -> (node, result); holding the node keeps its id from being reused.
+    memo: Dict[int, Any] = {}
+    base_eval = checker.eval
+
+    def shared_eval(node):
+        entry = memo.get(id(node))
+        if entry is None:
+            entry = memo[id(node)] = (node, base_eval(node))
+        return entry[1]
+
+    checker.eval = shared_eval
+    try:
+        yield checker
+    finally:
+        del checker.eval
+
+
+__all__ = [
+    "OptimizationResult",
+    "count_fixpoints",
+    "hash_cons",
+    "optimize_formula",
+    "shared_subformulas",
+]
@@ -0,0 +1,169 @@
+"""Satisfying-set result objects returned by the model checkers.
+
+:class:`SatisfyingSet` wraps the BDD produced by
+:class:`~src.bddctl.CTLModelChecker` and never materializes its members:
+counting is linear in the BDD size, membership is a single implication test
+and iteration streams state IDs in increasing order.  Set algebra between
+results, and restriction to the initial states, stays symbolic.
+
+:class:`ExplicitSatisfyingSet` offers the same interface over the Python set
+computed by :class:`~src.explicitctl.ExplicitCTLModelChecker`.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator, Set
+
+
+class SatisfyingSet:
+    """Set of states of a BDD-backed transition system."""
+
+    def __init__(self, ts, node) -> None:
+        self.ts = ts
+        self.bdd = ts.bdd
+        self.node = node & ts.domain
+
+    def _wrap(self, node) -> "SatisfyingSet":
+        return SatisfyingSet(self.ts, node)
+
+    def _check_compatible(self, other: "SatisfyingSet") -> None:
+        if other.ts is not self.ts:
+            raise ValueError("Cannot combine results from different transition systems")
+
+    def count(self) -> int:
+        return self.bdd.count(self.node, nvars=len(self.ts.state_vars))
+
+    def is_empty(self) -> bool:
+        return self.node == self.bdd.false
+
+    def __bool__(self) -> bool:
+        return not self.is_empty()
+
+    def __contains__(self, state: int) -> bool:
+        if not 0 <= state < self.ts.num_states:
+            return False
+        return self.ts.state_bdd(state) <= self.node
+
+    def __iter__(self) -> Iterator[int]:
+        # Depth-first over the state bits from most to least significant,
+        # visiting the 0-branch first so IDs come out in increasing order.
+        bdd = self.bdd
+        bits = self.ts.state_vars
+        stack = [(self.node, len(bits), 0)]
+        while stack:
+            u, k, prefix = stack.pop()
+            if u == bdd.false:
+                continue
+            if u == bdd.true:
+                yield from range(prefix << k, (prefix + 1) << k)
+                continue
+            var = bits[k - 1]
+            stack.append((bdd.let({var: True}, u), k - 1, 2 * prefix + 1))
+            stack.append((bdd.let({var: False}, u), k - 1, 2 * prefix))
+
+    def __and__(self, other: "SatisfyingSet") -> "SatisfyingSet":
+        self._check_compatible(other)
+        return self._wrap(self.node & other.node)
+
+    def __or__(self, other: "SatisfyingSet") -> "SatisfyingSet":
+        self._check_compatible(other)
+        return self._wrap(self.node | other.node)
+
+    def __sub__(self, other: "SatisfyingSet") -> "SatisfyingSet":
+        self._check_compatible(other)
+        return self._wrap(self.node & ~other.node)
+
+    def __invert__(self) -> "SatisfyingSet":
+        return self._wrap(~self.node)
+
+    def __le__(self, other: "SatisfyingSet") -> bool:
+        self._check_compatible(other)
+        return self.node <= other.node
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SatisfyingSet):
+            return NotImplemented
+        return other.ts is self.ts and self.node == other.node
+
+    __hash__ = None
+
+    def initial(self) -> "SatisfyingSet":
+        """Restrict to the initial states."""
+        return self._wrap(self.node & self.ts.init_bdd())
+
+    def holds_initially(self) -> bool:
+        """True if every initial state is in the set."""
+        return self.ts.init_bdd() <= self.node
+
+    def __repr__(self) -> str:
+        return f"SatisfyingSet(count={self.count()})"
+
+
+class ExplicitSatisfyingSet:
+    """Set of states of an explicit transition system."""
+
+    def __init__(self, ts, states: Set[int]) -> None:
+        self.ts = ts
+        self.states = frozenset(states)
+
+    def _wrap(self, states) -> "ExplicitSatisfyingSet":
+        return ExplicitSatisfyingSet(self.ts, states)
+
+    def _check_compatible(self, other: "ExplicitSatisfyingSet") -> None:
+        if other.ts is not self.ts:
+            raise ValueError("Cannot combine results from different transition systems")
+
+    def count(self) -> int:
+        return len(self.states)
+
+    def is_empty(self) -> bool:
+        return not self.states
+
+    def __bool__(self) -> bool:
+        return bool(self.states)
+
+    def __contains__(self, state: int) -> bool:
+        return state in self.states
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(sorted(self.states))
+
+    def __and__(self, other: "ExplicitSatisfyingSet") -> "ExplicitSatisfyingSet":
+        self._check_compatible(other)
+        return self._wrap(self.states & other.states)
+
+    def __or__(self, other: "ExplicitSatisfyingSet") -> "ExplicitSatisfyingSet":
+        self._check_compatible(other)
+        return self._wrap(self.states | other.states)
+
+    def __sub__(self, other: "ExplicitSatisfyingSet") -> "ExplicitSatisfyingSet":
+        self._check_compatible(other)
+        return self._wrap(self.states - other.states)
+
+    def __invert__(self) -> "ExplicitSatisfyingSet":
+        return self._wrap(set(range(self.ts.num_states)) - self.states)
+
+    def __le__(self, other: "ExplicitSatisfyingSet") -> bool:
+        self._check_compatible(other)
+        return self.states <= other.states
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, ExplicitSatisfyingSet):
+            return NotImplemented
+        return other.ts is self.ts and self.states == other.states
+
+    __hash__ = None
+
+    def initial(self) -> "ExplicitSatisfyingSet":
+        """Restrict to the initial states."""
+        return self._wrap(self.states & self.ts.init)
+
+    def holds_initially(self) -> bool:
+        """True if every initial state is in the set."""
+        return self.ts.init <= self.states
+
+    def __repr__(self) -> str:
+        return f"ExplicitSatisfyingSet(count={self.count()})"
+
+
+__all__ = ["SatisfyingSet", "ExplicitSatisfyingSet"]
@@ -0,0 +1,409 @@
+"""Automatic backend selection.
+
+:func:`check` is a front door that picks the cheapest backend for a model and
+a set of formulas: the explicit checker, the BDD checker, or the native C
+checker in ``c_src/``.  The choice comes from :class:`CostModel`, whose
+constants are fitted by :func:`calibrate` on the ring workload of
+``benchmarks/run_benchmarks.py``.  Run ``benchmarks/calibrate_cost_model.py``
+to refit them on another machine.
+
+Each estimate is ``build + per-iteration cost × fixpoints × iterations``:
+
+* explicit: every fixpoint iteration scans all states and edges;
+* BDD: the transition relation is built one edge at a time, and each
+  iteration costs in proportion to its size, estimated from sample builds;
+* native: a process per formula, plus an explicit scan at C speed.
+
+Every atom a formula mentions adds a scan of the labeling.  For the BDD
+backend that scan also ORs in one state cube per labeled state, so its cost
+grows with the fraction of states that carry a label.
+
+The decision and the reason for it are logged on this module's logger.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import subprocess
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+
+from .bddctl import CTLModelChecker, TransitionSystem, parse_ctl
+from .explicitctl import ExplicitCTLModelChecker, ExplicitTransitionSystem
+from .optimizer import optimize_formula
+from .symbolic import SymbolicTransitionSystem
+
+logger = logging.getLogger(__name__)
+
+NATIVE_BINARY = Path(__file__).resolve().parents[1] / "c_src" / "ctl_checker"
+
+BACKENDS = ("explicit", "bdd", "native")
+
+
+@dataclass
+class CostModel:
+    """Seconds per unit of work for each backend."""
+
+    explicit_step: float = 6.0e-8    # per (state + edge) per fixpoint iteration
+    bdd_build: float = 3.5e-5        # per (edge × state bit) when building T
+    bdd_node: float = 3.0e-6         # per BDD node of T per fixpoint iteration
+    bdd_label: float = 1.0e-6        # per (state + labeled state × bit) per atom
+    native_step: float = 2.0e-9      # per (state + edge) per fixpoint iteration
+    native_spawn: float = 2.0e-3     # per formula: process start-up
+    native_io: float = 3.0e-7        # per (state + edge) written per formula
+
+
+DEFAULT_COST_MODEL = CostModel()
+
+
+@dataclass
+class ModelFeatures:
+    num_states: int
+    num_transitions: int
+    labeled_fraction: float
+    iterations: int
+    bdd_size_estimate: int
+    symbolic: bool = False
+
+
+@dataclass
+class BackendDecision:
+    backend: str
+    reason: str
+    estimates: Dict[str, float]
+    features: ModelFeatures
+
+
+@dataclass
+class CheckResult:
+    results: List[bool]
+    decision: BackendDecision
+    elapsed: float = 0.0
+    formulas: List[str] = field(default_factory=list)
+
+
+# ------ model inspection ------
+def _iterations_estimate(num_states, transitions, init) -> int:
+    """Depth of a breadth-first search from ``init``, a proxy for how many
+    iterations a fixpoint needs."""
+    post = {}
+    for u, v in transitions:
+        post.setdefault(u, []).append(v)
+    depth = {s: 0 for s in init}
+    queue = deque(depth)
+    while queue:
+        s = queue.popleft()
+        for t in post.get(s, ()):
+            if t not in depth:
+                depth[t] = depth[s] + 1
+                queue.append(t)
+    return max(1, max(depth.values(), default=0) + 1)
+
+
+def _estimate_bdd_size(model) -> int:
+    """Extrapolate the size of ``T`` from two prefix builds."""
+    if isinstance(model, TransitionSystem):
+        return len(model.T)
+    m = len(model.transitions)
+    if m == 0:
+        return 1
+    k1, k2 = min(m, 64), min(m, 256)
+
+    def sample(k):
+        ts = TransitionSystem(num_states=model.num_states, transitions=model.transitions[:k], labeling={})
+        return len(ts.T)
+
+    s2 = sample(k2)
+    if k2 == m:
+        return s2
+    s1 = sample(k1)
+    growth = math.log(s2 / s1) / math.log(k2 / k1) if s1 > 0 and s2 > s1 else 1.0
+    return int(s2 * (m / k2) ** min(growth, 1.0))
+
+
+def analyze_model(model) -> ModelFeatures:
+    """Collect the features the cost model needs."""
+    if isinstance(model, SymbolicTransitionSystem):
+        edges = model.bdd.count(model.T, nvars=2 * model.num_bits)
+        labeled = model.bdd.false
+        for ap in model.atom_names():
+            labeled |= model.ap_bdd(ap)
+        valid = model.bdd.count(model.domain, nvars=model.num_bits)
+        return ModelFeatures(
+            num_states=model.num_states,
+            num_transitions=edges,
+            labeled_fraction=model.bdd.count(labeled, nvars=model.num_bits) / max(1, valid),
+            iterations=0,
+            bdd_size_estimate=len(model.T),
+            symbolic=True,
+        )
+    n = model.num_states
+    m = len(model.transitions)
+    init = model.init if model.init is not None else range(n)
+    labeled = [s for s, aps in model.labeling.items() if aps]
+    return ModelFeatures(
+        num_states=n,
+        num_transitions=m,
+        labeled_fraction=len(labeled) / max(1, n),
+        iterations=_iterations_estimate(n, model.transitions, init),
+        bdd_size_estimate=_estimate_bdd_size(model),
+    )
+
+
+# ------ decision ------
+def estimate_costs(features: ModelFeatures, fixpoints: int, num_formulas: int,
+                   cost_model: CostModel = DEFAULT_COST_MODEL, atoms: int = 0) -> Dict[str, float]:
+    """Estimated seconds for each backend.
+
+    ``atoms`` is the number of atom lookups, summed over the formulas.
+    """
+    n = features.num_states
+    size = n + features.num_transitions
+    # Boolean structure costs about one extra scan per formula.
+    sweeps = fixpoints * features.iterations + num_formulas
+    bits = max(1, math.ceil(math.log2(max(2, n))))
+    label_scan = atoms * n
+    return {
+        "explicit": cost_model.explicit_step * (size * sweeps + label_scan),
+        "bdd": cost_model.bdd_build * features.num_transitions * bits
+        + cost_model.bdd_node * features.bdd_size_estimate * sweeps
+        + cost_model.bdd_label * label_scan * (1 + features.labeled_fraction * bits),
+        "native": (cost_model.native_spawn + cost_model.native_io * size) * num_formulas
+        + cost_model.native_step * (size * sweeps + label_scan),
+    }
+
+
+def _atoms(ast) -> set:
+    # Optimized formulas are DAGs; visit each shared node once.
+    atoms, seen, stack = set(), set(), [ast]
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node[0] == "atom":
+            atoms.add(node[1])
+        else:
+            stack.extend(child for child in node[1:] if isinstance(child, tuple))
+    return atoms
+
+
+# Limits of c_src/ctl_checker.c: formula buffer and MAX_LABEL_LEN.
+_NATIVE_MAX_FORMULA = 511
+_NATIVE_MAX_LABEL = 63
+
+
+def _native_unavailable(model, formulas, native_binary: Path | None) -> str | None:
+    """Why the native checker cannot run ``formulas`` on ``model``, or None."""
+    if native_binary is None or not os.access(native_binary, os.X_OK):
+        return f"native binary not built (run 'make -C c_src' to build {native_binary})"
+    if any(len(f) >= _NATIVE_MAX_FORMULA for f in formulas):
+        return "formula too long for the native parser"
+    names = set().union(*model.labeling.values()) if model.labeling else set()
+    names |= set().union(*(_atoms(parse_ctl(f)) for f in formulas))
+    if any(len(name) > _NATIVE_MAX_LABEL for name in names):
+        return "atom or label too long for the native parser"
+    if any(not isinstance(s, int) or not 0 <= s < model.num_states for s in model.labeling):
+        return "labeling refers to states outside the model"
+    return None
+
+
+def choose_backend(model, formulas, cost_model: CostModel = DEFAULT_COST_MODEL,
+                   native_binary: Path | None = NATIVE_BINARY) -> BackendDecision:
+    """Pick a backend for checking ``formulas`` on ``model`` and say why."""
+    if isinstance(formulas, str):
+        formulas = [formulas]
+    features = analyze_model(model)
+    if features.symbolic:
+        decision = BackendDecision(
+            "bdd", "symbolic model: only the BDD backend avoids enumerating states",
+            {"bdd": 0.0}, features,
+        )
+        logger.info("backend=bdd: %s", decision.reason)
+        return decision
+
+    atoms = set().union(*model.labeling.values()) if model.labeling else set()
+    optimized = [optimize_formula(parse_ctl(f), atoms) for f in formulas]
+    fixpoints = sum(r.fixpoints_after for r in optimized)
+    lookups = sum(len(_atoms(r.ast)) for r in optimized)
+    estimates = estimate_costs(features, fixpoints, len(formulas), cost_model, atoms=lookups)
+    excluded = []
+    unavailable = _native_unavailable(model, formulas, native_binary)
+    if unavailable:
+        excluded.append(unavailable)
+        del estimates["native"]
+    backend = min(estimates, key=estimates.get)
+    ranked = ", ".join(f"{b}={estimates[b]:.3g}s" for b in sorted(estimates, key=estimates.get))
+    reason = (
+        f"{features.num_states} states, {features.num_transitions} edges, "
+        f"~{features.iterations} iterations x {fixpoints} fixpoints, "
+        f"{lookups} atom lookups, {features.labeled_fraction:.0%} of states labeled, "
+        f"T ~{features.bdd_size_estimate} BDD nodes; estimates {ranked}"
+    )
+    if excluded:
+        reason += "; " + "; ".join(excluded)
+    logger.info("backend=%s: %s", backend, reason)
+    return BackendDecision(backend, reason, estimates, features)
+
+
+# ------ execution ------
+def _native_input(model, formula: str) -> str:
+    n = model.num_states
+    init = sorted(model.init if model.init is not None else range(n))
+    lines = [f"states {n}", f"init {len(init)} " + " ".join(map(str, init))]
+    lines.append(f"transitions {len(model.transitions)}")
+    lines.extend(f"{u} {v}" for u, v in model.transitions)
+    lines.append(f"labels {len(model.labeling)}")
+    for state, props in model.labeling.items():
+        lines.append(f"{state} {len(props)} " + " ".join(sorted(props)))
+    lines.append(formula)
+    return "\n".join(lines) + "\n"
+
+
+def _check_native(model, formulas, binary: Path) -> List[bool]:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "input.txt")
+        for formula in formulas:
+            with open(path, "w") as f:
+                f.write(_native_input(model, formula))
+            out = subprocess.run([str(binary), path], capture_output=True, text=True)
+            verdict = out.stdout.strip()
+            if verdict not in ("true", "false"):
+                raise ValueError(f"native checker failed on {formula!r}: {out.stderr.strip()}")
+            results.append(verdict == "true")
+    return results
+
+
+def _build_checker(model, backend: str):
+    if backend == "bdd":
+        if isinstance(model, (TransitionSystem, SymbolicTransitionSystem)):
+            return CTLModelChecker(model)
+        return CTLModelChecker(TransitionSystem(
+            num_states=model.num_states, transitions=model.transitions,
+            labeling=model.labeling, init=model.init,
+        ))
+    if isinstance(model, ExplicitTransitionSystem):
+        return ExplicitCTLModelChecker(model)
+    return ExplicitCTLModelChecker(ExplicitTransitionSystem(
+        num_states=model.num_states, transitions=model.transitions,
+        labeling=model.labeling, init=model.init,
+    ))
+
+
+def check(model, formulas, backend: str = "auto", cost_model: CostModel = DEFAULT_COST_MODEL,
+          native_binary: Path | None = NATIVE_BINARY) -> CheckResult:
+    """Check ``formulas`` on ``model`` with the backend the cost model prefers.
+
+    ``model`` is a :class:`~src.symbolic.SymbolicTransitionSystem` or any
+    object with ``num_states``, ``transitions``, ``labeling`` and ``init``,
+    such as either transition system class.  Pass ``backend`` to override the
+    automatic choice; an override the model or environment cannot honour
+    raises :class:`ValueError`.
+    """
+    if isinstance(formulas, str):
+        formulas = [formulas]
+    formulas = list(formulas)
+    if backend not in ("auto",) + BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}")
+    if backend in ("explicit", "native") and isinstance(model, SymbolicTransitionSystem):
+        raise ValueError(
+            f"Backend {backend!r} needs an enumerated model; "
+            "symbolic models can only be checked with the 'bdd' backend"
+        )
+    if backend == "native":
+        unavailable = _native_unavailable(model, formulas, native_binary)
+        if unavailable:
+            raise ValueError(f"Backend 'native' is unavailable: {unavailable}")
+    if backend == "auto":
+        decision = choose_backend(model, formulas, cost_model, native_binary)
+    else:
+        decision = BackendDecision(backend, "requested explicitly", {}, analyze_model(model))
+        logger.info("backend=%s: %s", backend, decision.reason)
+
+    start = time.perf_counter()
+    if decision.backend == "native":
+        results = _check_native(model, formulas, native_binary)
+    else:
+        checker = _build_checker(model, decision.backend)
+        results = [bool(checker.satisfies(f, optimize=True)) for f in formulas]
+    return CheckResult(results, decision, time.perf_counter() - start, formulas)
+
+
+# ------ calibration ------
+def _ring(n: int):
+    return [(i, (i + 1) % n) for i in range(n)], {n // 2: {"p"}}
+
+
+def calibrate(sizes=(50, 100, 200), native_sizes=(500, 1000, 2000), formula: str = "AF p",
+              native_binary: Path | None = NATIVE_BINARY) -> CostModel:
+    """Fit :class:`CostModel` constants on the ring benchmark workload.
+
+    The native checker runs on larger rings so its per-step cost is not
+    swamped by process start-up.
+    """
+    fits: Dict[str, list] = {k: [] for k in ("explicit", "build", "node", "label", "native")}
+    for n in sizes:
+        transitions, labeling = _ring(n)
+        sweeps = n + 1  # AF p on a ring grows by one state per iteration
+        work = 2 * n * sweeps
+
+        ets = ExplicitTransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init={0})
+        start = time.perf_counter()
+        ExplicitCTLModelChecker(ets).satisfies(formula, optimize=True)
+        fits["explicit"].append((time.perf_counter() - start) / work)
+
+        start = time.perf_counter()
+        ts = TransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init={0})
+        fits["build"].append((time.perf_counter() - start) / (n * ts.num_bits))
+        start = time.perf_counter()
+        ts.ap_bdd("p")
+        fits["label"].append((time.perf_counter() - start) / (n + len(labeling) * ts.num_bits))
+        start = time.perf_counter()
+        CTLModelChecker(ts).satisfies(formula, optimize=True)
+        fits["node"].append((time.perf_counter() - start) / (len(ts.T) * sweeps))
+
+    if native_binary is not None and os.access(native_binary, os.X_OK):
+        for n in native_sizes:
+            transitions, labeling = _ring(n)
+            ets = ExplicitTransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init={0})
+            start = time.perf_counter()
+            _check_native(ets, [formula], native_binary)
+            fits["native"].append((time.perf_counter() - start, 2 * n * (n + 1)))
+
+    def median(xs):
+        return sorted(xs)[len(xs) // 2]
+
+    model = CostModel(
+        explicit_step=median(fits["explicit"]),
+        bdd_build=median(fits["build"]),
+        bdd_node=median(fits["node"]),
+        bdd_label=median(fits["label"]),
+    )
+    if fits["native"]:
+        # Attribute the fastest run to process start-up, the rest to work.
+        spawn = min(t for t, _ in fits["native"])
+        model.native_spawn = spawn
+        model.native_step = max(
+            median([(t - spawn) / work for t, work in fits["native"]]), 1e-10
+        )
+    return model
+
+
+__all__ = [
+    "BackendDecision",
+    "CheckResult",
+    "CostModel",
+    "ModelFeatures",
+    "analyze_model",
+    "calibrate",
+    "check",
+    "choose_backend",
+    "estimate_costs",
+]
@@ -0,0 +1,312 @@
+"""Resident asyncio model-checking service.
+
+A :class:`ModelService` keeps named models loaded and answers check requests
+without rebuilding the parser, the ``dd`` manager or the transition relation
+each time.  Concurrent requests on the same model are coalesced into one
+batch whose formulas share a single evaluation plan, so a subformula common
+to several queries is computed once.  Batches run on an executor so the
+event loop stays responsive.
+
+Requests can be submitted in-process with :meth:`ModelService.check`, as
+newline-delimited JSON over a Unix socket, or as HTTP ``POST /check``::
+
+    {"model": "ring", "formulas": ["AF p", "EG q"]}
+    -> {"results": [true, false], "latency_ms": 1.7}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Tuple
+
+from .bddctl import parse_ctl
+from .optimizer import hash_cons, shared_subformulas
+
+
+@lru_cache(maxsize=4096)
+def _parse(formula: str):
+    return parse_ctl(formula)
+
+
+def check_batch(checker, formulas: List[str]) -> List[Tuple[str, Any]]:
+    """Check ``formulas`` against ``checker`` with one shared evaluation plan.
+
+    Subformula results are memoized for the duration of the batch.  Each
+    entry of the result is ``("ok", verdict)`` or ``("error", message)``.
+    """
+    results = []
+    table: Dict[Any, Any] = {}
+    with shared_subformulas(checker):
+        for formula in formulas:
+            try:
+                ast = hash_cons(_parse(formula), table)
+                results.append(("ok", bool(checker.satisfies(ast))))
+            except Exception as exc:
+                results.append(("error", f"{formula!r}: {exc}"))
+    return results
+
+
+# Models built inside a worker, keyed by (service token, name, generation).
+# With a process pool every worker process keeps its own copy.  Batches for
+# different models run on different threads, so access goes through the lock.
+_WORKER_MODELS: Dict[Tuple[str, str, int], Any] = {}
+_WORKER_MODELS_LOCK = threading.Lock()
+
+
+def _evict(token, name, before: int | None = None) -> None:
+    """Drop the models built for ``name``, or only those older than ``before``."""
+    with _WORKER_MODELS_LOCK:
+        for key in [k for k in _WORKER_MODELS
+                    if k[:2] == (token, name) and (before is None or k[2] < before)]:
+            del _WORKER_MODELS[key]
+
+
+def _run_batch(token, name, generation, factory, args, formulas):
+    key = (token, name, generation)
+    with _WORKER_MODELS_LOCK:
+        checker = _WORKER_MODELS.get(key)
+    if checker is None:
+        # Only one batch per generation is in flight, so building outside
+        # the lock cannot race with another build of the same key.  After a
+        # reload the old generation may still be draining; evicting only
+        # older generations keeps the two from evicting each other.
+        checker = factory(*args)
+        _evict(token, name, before=generation)
+        with _WORKER_MODELS_LOCK:
+            _WORKER_MODELS[key] = checker
+    return check_batch(checker, formulas)
+
+
+@dataclass
+class RequestMetric:
+    model: str
+    num_formulas: int
+    batch_size: int
+    latency: float
+    error: bool = False
+
+
+@dataclass
+class _ModelEntry:
+    factory: Callable[..., Any]
+    args: Tuple[Any, ...]
+    generation: int
+    pending: List[Tuple[List[str], asyncio.Future]] = field(default_factory=list)
+    draining: bool = False
+
+
+class _BadRequest(Exception):
+    """Malformed HTTP request framing."""
+
+
+_HTTP_STATUS = {200: "200 OK", 400: "400 Bad Request", 500: "500 Internal Server Error"}
+
+
+class ModelService:
+    """Keep named models loaded and serve batched check requests.
+
+    ``executor`` defaults to a thread pool.  Pass a
+    :class:`~concurrent.futures.ProcessPoolExecutor` to check different
+    models in parallel; model factories must then be picklable.
+    ``batch_window`` is how long (in seconds) the first request of a batch
+    waits for others to join it.
+
+    :meth:`unload` and :meth:`close` only evict models built in this process.
+    A process-pool worker keeps the models it built until it next builds a
+    newer version under the same name or the executor is shut down, so shut
+    down a caller-supplied pool to release that memory.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        max_workers: int | None = None,
+        batch_window: float = 0.0,
+        history: int = 1024,
+    ) -> None:
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=max_workers)
+        self.batch_window = batch_window
+        self.metrics: Deque[RequestMetric] = deque(maxlen=history)
+        self._models: Dict[str, _ModelEntry] = {}
+        self._token = uuid.uuid4().hex
+        self._generation = 0
+        self._tasks = set()
+
+    # ------ model registry ------
+    def load(self, name: str, factory: Callable[..., Any], *args) -> None:
+        """Register ``factory(*args)`` as the checker for model ``name``.
+
+        The factory returns a checker such as
+        :class:`~src.bddctl.CTLModelChecker`.  It runs once per worker, on
+        the first request for the model.
+        """
+        self._generation += 1
+        self._models[name] = _ModelEntry(factory, args, self._generation)
+
+    def unload(self, name: str) -> None:
+        del self._models[name]
+        _evict(self._token, name)
+
+    def models(self) -> List[str]:
+        return sorted(self._models)
+
+    # ------ checking ------
+    async def check(self, model: str, formulas) -> List[bool]:
+        """Check ``formulas`` (a string or list of strings) on ``model``."""
+        if isinstance(formulas, str):
+            formulas = [formulas]
+        formulas = list(formulas)
+        if model not in self._models:
+            raise KeyError(f"Unknown model {model!r}")
+        entry = self._models[model]
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        entry.pending.append((formulas, future))
+        if not entry.draining:
+            entry.draining = True
+            task = asyncio.create_task(self._drain(model, entry))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        results, batch_size, error = await future
+        self.metrics.append(RequestMetric(
+            model, len(formulas), batch_size, time.perf_counter() - start, error is not None,
+        ))
+        if error is not None:
+            raise error
+        return results
+
+    async def _drain(self, name: str, entry: _ModelEntry) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while entry.pending:
+                await asyncio.sleep(self.batch_window)
+                batch, entry.pending = entry.pending, []
+                unique = list(dict.fromkeys(f for formulas, _ in batch for f in formulas))
+                try:
+                    outcome = await loop.run_in_executor(
+                        self._executor, _run_batch, self._token, name,
+                        entry.generation, entry.factory, entry.args, unique,
+                    )
+                except Exception as exc:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_result((None, len(batch), exc))
+                    continue
+                verdicts = dict(zip(unique, outcome))
+                for formulas, future in batch:
+                    if future.done():
+                        continue
+                    errors = [verdicts[f][1] for f in formulas if verdicts[f][0] == "error"]
+                    if errors:
+                        future.set_result((None, len(batch), ValueError("; ".join(errors))))
+                    else:
+                        future.set_result(([verdicts[f][1] for f in formulas], len(batch), None))
+        finally:
+            entry.draining = False
+
+    def latency_summary(self, model: str | None = None) -> Dict[str, float]:
+        """Count, errors, mean, p50, p95 and max latency (seconds) of recent
+        requests, failed ones included."""
+        recent = [m for m in self.metrics if model is None or m.model == model]
+        samples = sorted(m.latency for m in recent)
+        if not samples:
+            return {"count": 0}
+
+        def pct(q):
+            return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+        return {
+            "count": len(samples),
+            "errors": sum(m.error for m in recent),
+            "mean": sum(samples) / len(samples),
+            "p50": pct(0.50),
+            "p95": pct(0.95),
+            "max": samples[-1],
+        }
+
+    def close(self) -> None:
+        for name in list(self._models):
+            self.unload(name)
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    # ------ transports ------
+    async def _dispatch(self, payload) -> Tuple[int, Dict[str, Any]]:
+        """Answer one request as an HTTP-style status code and JSON body."""
+        start = time.perf_counter()
+        try:
+            results = await self.check(payload["model"], payload["formulas"])
+        except (KeyError, ValueError, TypeError) as exc:
+            return 400, {"error": str(exc)}
+        except Exception as exc:
+            return 500, {"error": f"internal error: {exc!r}"}
+        return 200, {"results": results, "latency_ms": (time.perf_counter() - start) * 1000.0}
+
+    async def handle_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return (await self._dispatch(payload))[1]
+
+    async def _handle_json_lines(self, reader, writer) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    response = await self.handle_request(json.loads(line))
+                except json.JSONDecodeError as exc:
+                    response = {"error": f"invalid JSON: {exc}"}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def start_unix_server(self, path: str):
+        """Serve newline-delimited JSON requests on the Unix socket ``path``."""
+        return await asyncio.start_unix_server(self._handle_json_lines, path=path)
+
+    async def _handle_http(self, reader, writer) -> None:
+        try:
+            request_line = (await reader.readline()).decode().split()
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                key, _, value = line.decode().partition(":")
+                headers[key.strip().lower()] = value.strip()
+            length = headers.get("content-length", "0")
+            if not length.isdigit():
+                raise _BadRequest(f"invalid Content-Length: {length!r}")
+            body = await reader.readexactly(int(length))
+            status, response = "404 Not Found", {"error": "not found"}
+            if request_line[:2] == ["POST", "/check"]:
+                try:
+                    code, response = await self._dispatch(json.loads(body))
+                    status = _HTTP_STATUS[code]
+                except json.JSONDecodeError as exc:
+                    status, response = "400 Bad Request", {"error": f"invalid JSON: {exc}"}
+            elif request_line[:2] == ["GET", "/metrics"]:
+                status, response = "200 OK", self.latency_summary()
+        except _BadRequest as exc:
+            status, response = "400 Bad Request", {"error": str(exc)}
+        except Exception as exc:
+            status, response = "500 Internal Server Error", {"error": f"internal error: {exc!r}"}
+        try:
+            data = json.dumps(response).encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def start_http_server(self, host: str = "127.0.0.1", port: int = 0):
+        """Serve ``POST /check`` and ``GET /metrics`` over HTTP/1.1."""
+        return await asyncio.start_server(self._handle_http, host=host, port=port)
+
+
+__all__ = ["ModelService", "RequestMetric", "check_batch"]
@@ -0,0 +1,416 @@
+"""Symbolic model input via guarded commands.
+
+Instead of enumerating states and edges, a model is described by state
+variables (booleans or bounded integers), an initial-state predicate and a
+set of guarded update commands grouped into modules.  Everything is compiled
+directly into BDDs in a ``dd`` manager, so the resulting
+:class:`SymbolicTransitionSystem` can be handed to
+:class:`~src.bddctl.CTLModelChecker` like any other transition system.
+
+Predicates and update expressions use a small language::
+
+    x < 7 AND NOT flag          -- boolean connectives AND, OR, NOT
+    x + 1, y - x                -- integer addition and subtraction
+    x = y, x != 3, x <= 2       -- comparisons
+    TRUE, FALSE                 -- boolean constants
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple
+
+from dd.autoref import BDD
+
+# bddctl installs the lark warning filters, so it must be imported first.
+from . import bddctl  # noqa: F401
+from lark import Lark, Transformer  # noqa: E402
+
+
+class ExprParser(Transformer):
+    def start(self, args):
+        return args[0]
+
+    def or_expr(self, args):
+        left, right = args
+        return ('or', left, right)
+
+    def and_expr(self, args):
+        left, right = args
+        return ('and', left, right)
+
+    def not_expr(self, args):
+        (child,) = args
+        return ('not', child)
+
+    def cmp_expr(self, args):
+        left, op, right = args
+        return ('cmp', str(op), left, right)
+
+    def add_expr(self, args):
+        left, right = args
+        return ('add', left, right)
+
+    def sub_expr(self, args):
+        left, right = args
+        return ('sub', left, right)
+
+    def neg_expr(self, args):
+        (child,) = args
+        return ('sub', ('const', 0), child)
+
+    def true_expr(self, args):
+        return ('bool', True)
+
+    def false_expr(self, args):
+        return ('bool', False)
+
+    def number(self, args):
+        return ('const', int(args[0]))
+
+    def name(self, args):
+        return ('var', str(args[0]))
+
+
+expr_grammar = r"""
+?start: expr
+?expr: or
+?or: and
+    | or "OR" and        -> or_expr
+?and: unary
+    | and "AND" unary    -> and_expr
+?unary: "NOT" unary      -> not_expr
+      | cmp
+?cmp: sum
+    | sum CMP_OP sum     -> cmp_expr
+?sum: term
+    | sum "+" term       -> add_expr
+    | sum "-" term       -> sub_expr
+?term: "-" term          -> neg_expr
+     | "TRUE"            -> true_expr
+     | "FALSE"           -> false_expr
+     | NUMBER            -> number
+     | NAME              -> name
+     | "(" expr ")"
+
+CMP_OP: "<=" | ">=" | "!=" | "=" | "<" | ">"
+NAME: /[a-zA-Z_][a-zA-Z0-9_]*/
+%import common.INT -> NUMBER
+%import common.WS
+%ignore WS
+"""
+
+expr_parser = Lark(expr_grammar, start='start', parser='lalr', transformer=ExprParser())
+
+
+def parse_expr(text: str):
+    return expr_parser.parse(text)
+
+
+@dataclass
+class Command:
+    """Guarded command: when ``guard`` holds, apply ``updates`` atomically.
+
+    ``updates`` maps a variable owned by the enclosing module to an expression
+    over current-state variables.  Variables that are not updated keep their
+    value.  An update whose value falls outside the variable's range disables
+    the command in that state.
+    """
+
+    guard: str
+    updates: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Module:
+    """A group of variables together with the commands that may update them.
+
+    ``variables`` maps names to ``bool`` or to an inclusive ``(lo, hi)``
+    integer range.  ``init`` is a predicate over the module's variables.
+    """
+
+    name: str
+    variables: Dict[str, Any]
+    commands: List[Command]
+    init: str = "TRUE"
+
+
+@dataclass
+class SymbolicTransitionSystem:
+    """Transition system compiled from guarded-command modules.
+
+    ``composition`` is either ``"interleaving"`` (one module moves per step)
+    or ``"synchronous"`` (all modules move together).  ``atoms`` maps atomic
+    proposition names to predicates over the state variables.
+
+    State IDs pack the bits of ``state_vars`` little-endian, as in
+    :class:`~src.bddctl.TransitionSystem`; :meth:`valuation` decodes one.
+    """
+
+    modules: List[Module]
+    atoms: Dict[str, str] = field(default_factory=dict)
+    composition: str = "interleaving"
+
+    def __post_init__(self):
+        if self.composition not in ("interleaving", "synchronous"):
+            raise ValueError(f"Unknown composition {self.composition!r}")
+        self.bdd = BDD()
+        # name -> (lo, hi, bit names); booleans are recorded as (0, 1)
+        self.var_info: Dict[str, Tuple[int, int, List[str]]] = {}
+        self.bool_vars = set()
+        self.owner: Dict[str, str] = {}
+        self.state_vars: List[str] = []
+        self.next_vars: List[str] = []
+        for module in self.modules:
+            for name, dom in module.variables.items():
+                self._declare_var(module.name, name, dom)
+        self.num_bits = len(self.state_vars)
+        self.num_states = 2 ** self.num_bits
+        # Interleave current and next copies of each bit; this keeps the
+        # transition relation compact for frame conditions.
+        order = [v for pair in zip(self.state_vars, self.next_vars) for v in pair]
+        self.bdd.declare(*order)
+        self.var_map = {v: vp for v, vp in zip(self.state_vars, self.next_vars)}
+        self.var_map_inv = {vp: v for v, vp in zip(self.state_vars, self.next_vars)}
+
+        self.domain = self.bdd.true
+        for name in self.var_info:
+            self.domain &= self._in_range(name)
+        self.init = self.domain
+        for module in self.modules:
+            self.init &= self._compile_bool(parse_expr(module.init))
+        self._build_transition_relation()
+        self._ap_cache = {ap: self._compile_bool(parse_expr(text)) & self.domain
+                          for ap, text in self.atoms.items()}
+
+    # ------ declarations ------
+    # Integer bits are named ``x.0``, ``x.1``, ... and next-state copies
+    # ``x'``; neither ``.`` nor ``'`` can appear in a NAME of the expression
+    # language, so BDD variables never collide with user variables.
+    def _declare_var(self, module: str, name: str, dom):
+        if name in self.var_info:
+            raise ValueError(f"Variable {name!r} declared twice")
+        if dom is bool:
+            lo, hi = 0, 1
+            bits = [name]
+            self.bool_vars.add(name)
+        else:
+            lo, hi = dom
+            if hi < lo:
+                raise ValueError(f"Empty range for variable {name!r}")
+            width = max(1, math.ceil(math.log2(hi - lo + 1)))
+            bits = [f"{name}.{i}" for i in range(width)]
+        self.var_info[name] = (lo, hi, bits)
+        self.owner[name] = module
+        self.state_vars.extend(bits)
+        self.next_vars.extend(f"{b}'" for b in bits)
+
+    def _encode(self, bits: List[str], value: int):
+        result = self.bdd.true
+        for i, var in enumerate(bits):
+            if (value >> i) & 1:
+                result &= self.bdd.var(var)
+            else:
+                result &= ~self.bdd.var(var)
+        return result
+
+    def _raw_word(self, bits: List[str]) -> List[Any]:
+        """Unsigned word of ``bits`` with a zero sign bit appended."""
+        return [self.bdd.var(b) for b in bits] + [self.bdd.false]
+
+    def _in_range(self, name: str):
+        lo, hi, bits = self.var_info[name]
+        if hi - lo + 1 == 2 ** len(bits):
+            return self.bdd.true
+        return self._word_cmp('<=', self._raw_word(bits), self._const_word(hi - lo))
+
+    # ------ expression compilation ------
+    # Boolean expressions compile to a BDD.  Integer expressions compile to a
+    # word: a list of bit BDDs in little-endian two's complement whose last
+    # entry is the sign.  Every operation widens its result by one bit, so
+    # arithmetic never overflows and comparisons reduce to the sign and the
+    # zero test of a difference.
+    def _const_word(self, value: int) -> List[Any]:
+        bdd = self.bdd
+        return [bdd.true if (value >> i) & 1 else bdd.false
+                for i in range(value.bit_length() + 1)]
+
+    @staticmethod
+    def _extend(word: List[Any], width: int) -> List[Any]:
+        return word + [word[-1]] * (width - len(word))
+
+    def _word_add(self, left, right, subtract: bool = False) -> List[Any]:
+        """Ripple-carry ``left + right`` (or ``left - right``)."""
+        bdd = self.bdd
+        width = max(len(left), len(right)) + 1
+        left, right = self._extend(left, width), self._extend(right, width)
+        if subtract:
+            right = [~b for b in right]
+        carry = bdd.true if subtract else bdd.false
+        result = []
+        for a, b in zip(left, right):
+            half = bdd.apply('xor', a, b)
+            result.append(bdd.apply('xor', half, carry))
+            carry = (a & b) | (carry & half)
+        return result
+
+    def _word_cmp(self, op: str, left, right):
+        diff = self._word_add(left, right, subtract=True)
+        negative = diff[-1]
+        zero = self.bdd.true
+        for b in diff:
+            zero &= ~b
+        return {
+            '=': zero,
+            '!=': ~zero,
+            '<': negative,
+            '<=': negative | zero,
+            '>': ~(negative | zero),
+            '>=': ~negative,
+        }[op]
+
+    def _compile(self, node):
+        bdd = self.bdd
+        kind = node[0]
+        if kind == 'bool':
+            return bdd.true if node[1] else bdd.false
+        if kind == 'const':
+            return self._const_word(node[1])
+        if kind == 'var':
+            name = node[1]
+            if name not in self.var_info:
+                raise ValueError(f"Unknown variable {name!r}")
+            if name in self.bool_vars:
+                return bdd.var(name)
+            lo, _, bits = self.var_info[name]
+            word = self._raw_word(bits)
+            return self._word_add(word, self._const_word(lo)) if lo else word
+        if kind == 'not':
+            return ~self._compile_bool(node[1])
+        if kind == 'and':
+            return self._compile_bool(node[1]) & self._compile_bool(node[2])
+        if kind == 'or':
+            return self._compile_bool(node[1]) | self._compile_bool(node[2])
+        if kind in ('add', 'sub'):
+            left = self._compile_int(node[1])
+            right = self._compile_int(node[2])
+            return self._word_add(left, right, subtract=kind == 'sub')
+        if kind == 'cmp':
+            return self._compile_cmp(node[1], node[2], node[3])
+        raise ValueError(f"Unknown node kind {kind}")
+
+    def _compile_bool(self, node):
+        res = self._compile(node)
+        if isinstance(res, list):
+            raise ValueError(f"Expected a boolean expression, got {node!r}")
+        return res
+
+    def _compile_int(self, node):
+        res = self._compile(node)
+        if not isinstance(res, list):
+            raise ValueError(f"Expected an integer expression, got {node!r}")
+        return res
+
+    def _compile_cmp(self, op, left_node, right_node):
+        bdd = self.bdd
+        left = self._compile(left_node)
+        right = self._compile(right_node)
+        if not isinstance(left, list) and not isinstance(right, list):
+            if op == '=':
+                return bdd.apply('equiv', left, right)
+            if op == '!=':
+                return bdd.apply('xor', left, right)
+            raise ValueError(f"Operator {op!r} is not defined on booleans")
+        left = self._compile_int(left_node) if not isinstance(left, list) else left
+        right = self._compile_int(right_node) if not isinstance(right, list) else right
+        return self._word_cmp(op, left, right)
+
+    # ------ transition relation ------
+    def _frame(self, names):
+        result = self.bdd.true
+        for name in names:
+            for b in self.var_info[name][2]:
+                result &= self.bdd.apply('equiv', self.bdd.var(b), self.bdd.var(self.var_map[b]))
+        return result
+
+    def _update(self, name: str, text: str):
+        node = parse_expr(text)
+        if name in self.bool_vars:
+            value = self._compile_bool(node)
+            return self.bdd.apply('equiv', self.bdd.var(self.var_map[name]), value)
+        lo, hi, bits = self.var_info[name]
+        # Offset of the new value from ``lo``; it must fit in [0, hi - lo].
+        raw = self._word_add(self._compile_int(node), self._const_word(lo), subtract=True)
+        result = ~raw[-1] & self._word_cmp('<=', raw, self._const_word(hi - lo))
+        for b, value in zip(bits, raw):
+            result &= self.bdd.apply('equiv', self.bdd.var(self.var_map[b]), value)
+        return result
+
+    def _module_relation(self, module: Module):
+        owned = list(module.variables)
+        T = self.bdd.false
+        for cmd in module.commands:
+            for name in cmd.updates:
+                if self.owner.get(name) != module.name:
+                    raise ValueError(
+                        f"Module {module.name!r} cannot update variable {name!r}"
+                    )
+            step = self._compile_bool(parse_expr(cmd.guard))
+            for name, text in cmd.updates.items():
+                step &= self._update(name, text)
+            step &= self._frame([n for n in owned if n not in cmd.updates])
+            T |= step
+        return T
+
+    def _build_transition_relation(self):
+        bdd = self.bdd
+        if self.composition == "synchronous":
+            T = bdd.true
+            for module in self.modules:
+                T &= self._module_relation(module)
+        else:
+            T = bdd.false
+            for module in self.modules:
+                others = [n for n in self.var_info if self.owner[n] != module.name]
+                T |= self._module_relation(module) & self._frame(others)
+        self.T = T & self.domain & self._prime(self.domain)
+
+    # ------ TransitionSystem interface ------
+    def state_bdd(self, state: int):
+        assert 0 <= state < self.num_states
+        return self._encode(self.state_vars, state)
+
+    def valuation(self, state: int) -> Dict[str, Any]:
+        """Decode a state ID into a mapping from variable name to value."""
+        result: Dict[str, Any] = {}
+        offset = 0
+        for name, (lo, hi, bits) in self.var_info.items():
+            raw = (state >> offset) & ((1 << len(bits)) - 1)
+            offset += len(bits)
+            result[name] = bool(raw) if name in self.bool_vars else lo + raw
+        return result
+
+    def init_bdd(self):
+        return self.init
+
+    def _prime(self, node):
+        return self.bdd.let(self.var_map, node)
+
+    def _unprime(self, node):
+        return self.bdd.let(self.var_map_inv, node)
+
+    def atom_names(self):
+        return set(self.atoms)
+
+    def ap_bdd(self, ap: str):
+        return self._ap_cache.get(ap, self.bdd.false)
+
+    def pre(self, X):
+        return self.bdd.exist(self.next_vars, self.T & self._prime(X))
+
+    def post(self, X):
+        return self._unprime(self.bdd.exist(self.state_vars, X & self.T))
+
+
+__all__ = ["Command", "Module", "SymbolicTransitionSystem", "parse_expr"]
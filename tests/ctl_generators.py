@@ -0,0 +1,23 @@
+"""Random formulas and transition systems shared by the checker tests."""
+
+UNARY = ["NOT", "EX", "AX", "EF", "AF", "EG", "AG"]
+
+
+def random_formula(rng, depth):
+    if depth == 0 or rng.random() < 0.2:
+        return rng.choice(["p", "q", "r", "missing"])
+    choice = rng.randrange(4)
+    if choice == 0:
+        return f"{rng.choice(UNARY)} ({random_formula(rng, depth - 1)})"
+    left, right = random_formula(rng, depth - 1), random_formula(rng, depth - 1)
+    if choice == 1:
+        return f"({left}) {rng.choice(['AND', 'OR'])} ({right})"
+    return f"{rng.choice('EA')}[{left} U {right}]"
+
+
+def random_system(rng, n):
+    # Leave some states without successors to exercise deadlock semantics.
+    transitions = [(u, rng.randrange(n)) for u in range(n) for _ in range(rng.randrange(3))]
+    labeling = {s: {ap for ap in ("p", "q", "r") if rng.random() < 0.4} for s in range(n)}
+    init = {s for s in range(n) if rng.random() < 0.5} or {0}
+    return transitions, labeling, init
@@ -0,0 +1,114 @@
+import os
+import random
+import sys
+import time
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.explicitctl import ExplicitTransitionSystem, ExplicitCTLModelChecker
+from src.localctl import LocalCTLModelChecker
+from ctl_generators import random_formula, random_system
+
+
+def build_checker():
+    post = {0: [1], 1: [1, 2], 2: [2]}
+    labeling = {0: {"q"}, 1: {"q"}, 2: {"p"}}
+    return LocalCTLModelChecker(init=[0], successors=post.__getitem__, labels=labeling.__getitem__)
+
+
+@pytest.mark.parametrize("formula, expected", [
+    ("EF p", True), ("AG p", False), ("AF p", False), ("EG q", True),
+    ("EX p", False), ("AX q", True), ("E[q U p]", True), ("A[q U p]", False),
+])
+def test_basic_formulas(formula, expected):
+    assert build_checker().satisfies(formula) == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_explicit_checker(seed):
+    rng = random.Random(seed)
+    n = rng.randrange(2, 12)
+    transitions, labeling, init = random_system(rng, n)
+    ets = ExplicitTransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init=init)
+    exp_mc = ExplicitCTLModelChecker(ets)
+    local = LocalCTLModelChecker(init, ets.post_map.__getitem__, lambda s: labeling.get(s, set()))
+    for _ in range(10):
+        formula = random_formula(rng, 3)
+        expected = exp_mc.sat_set(formula)
+        assert [local.holds(formula, s) for s in range(n)] == [s in expected for s in range(n)], formula
+        assert local.satisfies(formula) == exp_mc.satisfies(formula)
+
+
+def test_infinite_state_space_is_explored_lazily():
+    # Unbounded counter: the state space is infinite, the relevant part is not.
+    mc = LocalCTLModelChecker(
+        init=[0],
+        successors=lambda n: [n + 1, 0],
+        labels=lambda n: {"goal"} if n == 10 else set(),
+    )
+    assert mc.satisfies("EF goal")
+    assert mc.explored_states <= 11
+    assert mc.satisfies("EG NOT goal")
+    assert not mc.satisfies("AG NOT goal")
+
+
+def test_stops_at_first_violating_initial_state():
+    calls = []
+
+    def successors(n):
+        calls.append(n)
+        return [n]
+
+    mc = LocalCTLModelChecker(init=range(10 ** 6), successors=successors, labels=lambda n: {"even"} if n % 2 == 0 else set())
+    assert not mc.satisfies("AX even")
+    assert calls == [0, 1]
+
+
+@pytest.mark.parametrize("formula, labeling", [
+    ("EF goal", lambda s: {"goal"} if s[0] == "goal" else set()),
+    ("EG loop", lambda s: set() if s[0] == "dead" else {"loop"}),
+])
+def test_failed_regions_are_explored_once(formula, labeling):
+    # Every initial state first walks a long chain that leads nowhere, then
+    # finds its witness next door.  The chain must be searched only once.
+    length, starts = 200, 50
+
+    def successors(s):
+        kind, i = s
+        if kind == "init":
+            return [("chain", 0), ("goal" if formula == "EF goal" else "loop", i)]
+        if kind == "chain":
+            return [("chain", i + 1)] if i < length else [("dead", 0)]
+        return [s] if kind == "loop" else []
+
+    mc = LocalCTLModelChecker([("init", i) for i in range(starts)], successors, labeling)
+    expansions = []
+    succ = mc._succ
+    mc._succ = lambda s: expansions.append(s) or succ(s)
+    assert mc.satisfies(formula)
+    assert expansions.count(("chain", 0)) == 1
+    assert len(expansions) <= length + 2 + 2 * starts
+
+
+def test_state_reaching_an_open_ancestor_is_not_decided_early():
+    # From 0 the search tries 1 first; 1 only leads back to 0, which is still
+    # undecided when 1 is backtracked from.
+    post = {0: [1, 2], 1: [0], 2: [3], 3: [3]}
+    mc = LocalCTLModelChecker([0], post.__getitem__, lambda s: {"p"} if s == 3 else set())
+    assert mc.holds("EF p", 0)
+    assert mc.holds("EF p", 1)
+
+
+def test_nested_until_and_repeated_queries_reuse_verdicts():
+    formula = "p"
+    for _ in range(30):
+        formula = f"A[q U {formula}]"
+    post = {0: [1], 1: [2], 2: [0]}
+    labeling = {0: {"q"}, 1: {"q"}, 2: {"p"}}
+    mc = LocalCTLModelChecker([0], post.__getitem__, labeling.__getitem__)
+    start = time.perf_counter()
+    assert mc.satisfies(formula)
+    assert time.perf_counter() - start < 1.0
+    subformulas = len(mc._memo)
+    assert mc.holds(formula, 1)
+    assert len(mc._memo) == subformulas
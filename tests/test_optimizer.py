@@ -0,0 +1,95 @@
+import os
+import random
+import sys
+import time
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.bddctl import TransitionSystem, CTLModelChecker, parse_ctl
+from src.explicitctl import ExplicitTransitionSystem, ExplicitCTLModelChecker
+from src.optimizer import count_fixpoints, hash_cons, optimize_formula
+from ctl_generators import random_formula, random_system
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_optimized_matches_unoptimized(seed):
+    rng = random.Random(seed)
+    n = rng.randrange(2, 12)
+    transitions, labeling, init = random_system(rng, n)
+    bdd_mc = CTLModelChecker(TransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init=init))
+    exp_mc = ExplicitCTLModelChecker(ExplicitTransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init=init))
+    for _ in range(10):
+        formula = random_formula(rng, 3)
+        assert list(bdd_mc.sat_set(formula, optimize=True)) == list(bdd_mc.sat_set(formula)), formula
+        assert exp_mc.sat_set(formula, optimize=True) == exp_mc.sat_set(formula), formula
+        assert exp_mc.satisfies(formula, optimize=True) == bdd_mc.satisfies(formula)
+
+
+def test_idempotent_operators_collapse():
+    for text, expected in [
+        ("EF EF p", ('eu', ('true',), ('atom', 'p'))),
+        ("AG AG p", ('not', ('eu', ('true',), ('not', ('atom', 'p'))))),
+        ("AF AF p", ('not', ('eg', ('not', ('atom', 'p'))))),
+        ("EG EG p", ('eg', ('atom', 'p'))),
+        ("NOT NOT p", ('atom', 'p')),
+        ("AX AX p", ('not', ('ex', ('ex', ('not', ('atom', 'p')))))),
+    ]:
+        result = optimize_formula(parse_ctl(text), {"p"})
+        assert result.ast == expected, text
+    assert optimize_formula(parse_ctl("AG AG p"), {"p"}).fixpoints_eliminated == 1
+
+
+def test_missing_atoms_are_folded():
+    result = optimize_formula(parse_ctl("EF missing OR (p AND NOT missing)"), {"p"})
+    assert result.ast == ('atom', 'p')
+    assert result.fixpoints_before == 1
+    assert result.fixpoints_after == 0
+
+
+def test_common_subexpressions_are_shared():
+    ast = parse_ctl("EF (p AND q) AND AG NOT (q AND p)")
+    assert count_fixpoints(ast) == 2
+    result = optimize_formula(ast, {"p", "q"})
+    assert result.ast == ('false',)
+    result = optimize_formula(parse_ctl("EX EF p OR EF p"), {"p"})
+    assert result.fixpoints_after == 1
+
+
+def test_large_formula_is_hash_consed():
+    def balanced(depth, counter=[0]):
+        if depth == 0:
+            counter[0] += 1
+            return ('ef', ('atom', f"a{counter[0] % 8}"))
+        return ('and' if depth % 2 else 'or', balanced(depth - 1), balanced(depth - 1))
+
+    result = optimize_formula(balanced(12))
+    assert result.fixpoints_before == 4096
+    assert result.fixpoints_after == 8
+    assert result.fixpoints_eliminated == 4088
+
+
+def test_nested_until_is_not_rehashed():
+    # Every A[φ U ψ] uses NOT ψ three times, so the optimized DAG expands to
+    # a tree that triples with each level of nesting.
+    def nested(depth):
+        formula = "p"
+        for _ in range(depth):
+            formula = f"A[q U {formula}]"
+        return formula
+
+    transitions, labeling = [(0, 1), (1, 2), (2, 0)], {0: {"q"}, 1: {"q"}, 2: {"p"}}
+    exp_mc = ExplicitCTLModelChecker(ExplicitTransitionSystem(num_states=3, transitions=transitions, labeling=labeling, init={0}))
+    bdd_mc = CTLModelChecker(TransitionSystem(num_states=3, transitions=transitions, labeling=labeling, init={0}))
+    assert exp_mc.satisfies(nested(6), optimize=True) == exp_mc.satisfies(nested(6))
+    start = time.perf_counter()
+    assert exp_mc.satisfies(nested(30), optimize=True)
+    assert bdd_mc.satisfies(nested(30), optimize=True)
+    assert time.perf_counter() - start < 1.0
+
+
+def test_hash_cons_shares_equal_subtrees():
+    table = {}
+    first = hash_cons(parse_ctl("EF p AND EG EF p"), table)
+    second = hash_cons(parse_ctl("AX EF p"), table)
+    assert first == parse_ctl("EF p AND EG EF p")
+    assert first[1] is first[2][1] is second[1]
@@ -0,0 +1,61 @@
+import itertools
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.bddctl import TransitionSystem, CTLModelChecker
+from src.explicitctl import ExplicitTransitionSystem, ExplicitCTLModelChecker
+from src.symbolic import Command, Module, SymbolicTransitionSystem
+
+
+def build_systems(n=11):
+    """Chain of ``n`` states, ``p`` on every third state, ending in a self-loop."""
+    transitions = [(i, i + 1) for i in range(n - 1)] + [(n - 1, n - 1)]
+    labeling = {i: {"p"} for i in range(0, n, 3)}
+    ts = TransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init={0, 1})
+    ets = ExplicitTransitionSystem(num_states=n, transitions=transitions, labeling=labeling, init={0, 1})
+    return CTLModelChecker(ts), ExplicitCTLModelChecker(ets)
+
+
+@pytest.mark.parametrize("formula", ["p", "NOT p", "EX p", "EG NOT p", "AF p", "EF p"])
+def test_bdd_result_matches_explicit(formula):
+    bdd_mc, exp_mc = build_systems()
+    bdd_res = bdd_mc.sat_set(formula)
+    exp_res = exp_mc.sat_set(formula)
+    assert list(bdd_res) == list(exp_res)
+    assert bdd_res.count() == exp_res.count()
+    assert all((s in bdd_res) == (s in exp_res) for s in range(12))
+    assert bdd_res.holds_initially() == exp_res.holds_initially() == bdd_mc.satisfies(formula)
+
+
+def test_symbolic_set_operations():
+    bdd_mc, _ = build_systems()
+    p = bdd_mc.sat_set("p")
+    ex_p = bdd_mc.sat_set("EX p")
+    assert list(p | ex_p) == sorted(set(p) | set(ex_p))
+    assert list(bdd_mc.sat_set("EF p") & ~p) == [1, 2, 4, 5, 7, 8]
+    assert list(p - ex_p) == sorted(set(p) - set(ex_p))
+    assert list(~p) == [s for s in range(11) if s not in p]
+    assert list(p.initial()) == [0]
+    assert (p & ex_p).is_empty()
+    assert p <= bdd_mc.sat_set("EF p")
+
+
+def test_results_from_different_systems_rejected():
+    mc1, _ = build_systems()
+    mc2, _ = build_systems()
+    with pytest.raises(ValueError):
+        mc1.sat_set("p") & mc2.sat_set("p")
+
+
+def test_large_symbolic_set_is_counted_and_streamed_lazily():
+    flags = [
+        Module(name=f"m{i}", variables={f"b{i}": bool}, commands=[Command(guard="TRUE")])
+        for i in range(40)
+    ]
+    ts = SymbolicTransitionSystem(modules=flags, atoms={"b0": "b0"})
+    res = CTLModelChecker(ts).sat_set("NOT b0")
+    assert res.count() == 2 ** 39
+    assert list(itertools.islice(res, 4)) == [0, 2, 4, 6]
+    assert 2 ** 40 - 2 in res and 2 ** 40 - 1 not in res
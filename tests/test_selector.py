@@ -0,0 +1,110 @@
+import logging
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.explicitctl import ExplicitTransitionSystem
+from src.selector import NATIVE_BINARY, CostModel, check, choose_backend, estimate_costs
+from src.symbolic import Command, Module, SymbolicTransitionSystem
+
+FORMULAS = ["EF p", "AG p", "AF p", "EG q", "EX p", "AX q", "E[q U p]", "A[q U p]"]
+
+
+def build_model():
+    transitions = [(0, 1), (1, 1), (1, 2), (2, 2)]
+    labeling = {0: {"q"}, 1: {"q"}, 2: {"p"}}
+    return ExplicitTransitionSystem(num_states=3, transitions=transitions, labeling=labeling, init={0})
+
+
+def test_small_explicit_model_prefers_explicit_without_native():
+    decision = choose_backend(build_model(), FORMULAS, native_binary=None)
+    assert decision.backend == "explicit"
+    assert set(decision.estimates) == {"explicit", "bdd"}
+    assert "native binary not built" in decision.reason
+
+
+def test_symbolic_model_uses_bdd():
+    counter = Module(name="c", variables={"x": (0, 3)}, init="x = 0",
+                     commands=[Command(guard="x < 3", updates={"x": "x + 1"})])
+    ts = SymbolicTransitionSystem(modules=[counter], atoms={"p": "x = 3"})
+    result = check(ts, "EF p")
+    assert result.decision.backend == "bdd"
+    assert result.results == [True]
+
+
+def test_cost_model_prefers_bdd_for_compact_relations():
+    model = CostModel()
+    decision_features = choose_backend(build_model(), "EF p", native_binary=None).features
+    decision_features.num_states = decision_features.num_transitions = 10 ** 7
+    decision_features.iterations = 10 ** 4
+    decision_features.bdd_size_estimate = 50
+    estimates = estimate_costs(decision_features, fixpoints=1, num_formulas=1, cost_model=model)
+    assert estimates["bdd"] < estimates["explicit"]
+
+
+@pytest.mark.parametrize("backend", ["explicit", "bdd", "native"])
+def test_backends_agree(backend):
+    if backend == "native" and not os.access(NATIVE_BINARY, os.X_OK):
+        pytest.skip("native checker not built")
+    result = check(build_model(), FORMULAS, backend=backend)
+    assert result.results == [True, False, False, True, False, True, True, False]
+    assert result.decision.backend == backend
+
+
+def test_decision_is_logged(caplog):
+    with caplog.at_level(logging.INFO, logger="src.selector"):
+        result = check(build_model(), FORMULAS)
+    assert f"backend={result.decision.backend}" in caplog.text
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        check(build_model(), "EF p", backend="quantum")
+
+
+@pytest.mark.parametrize("backend", ["explicit", "native"])
+def test_symbolic_model_rejects_enumerating_backends(backend):
+    counter = Module(name="c", variables={"x": (0, 3)}, commands=[])
+    ts = SymbolicTransitionSystem(modules=[counter], atoms={"p": "x = 3"})
+    with pytest.raises(ValueError, match="symbolic"):
+        check(ts, "EF p", backend=backend)
+
+
+@pytest.mark.parametrize("binary", [None, "/nonexistent/ctl_checker"])
+def test_native_override_without_binary_rejected(binary):
+    with pytest.raises(ValueError, match="native binary not built"):
+        check(build_model(), "EF p", backend="native", native_binary=binary)
+
+
+def test_labeling_features_feed_the_estimates():
+    counter = Module(name="c", variables={"x": (0, 3)}, commands=[])
+    ts = SymbolicTransitionSystem(modules=[counter], atoms={"p": "x = 3", "q": "x < 2"})
+    assert check(ts, "EF p").decision.features.labeled_fraction == pytest.approx(0.75)
+
+    features = choose_backend(build_model(), "EF p", native_binary=None).features
+    base = estimate_costs(features, fixpoints=1, num_formulas=1)
+    with_atoms = estimate_costs(features, fixpoints=1, num_formulas=1, atoms=2)
+    assert all(with_atoms[b] > base[b] for b in base)
+    features.labeled_fraction /= 2
+    assert estimate_costs(features, fixpoints=1, num_formulas=1, atoms=2)["bdd"] < with_atoms["bdd"]
+
+
+def test_long_atoms_fall_back_from_native():
+    atom = "very_long_proposition_name_" * 3
+    n = 1000
+    transitions = [(i, (i + 1) % n) for i in range(n)]
+    ts = ExplicitTransitionSystem(num_states=n, transitions=transitions, labeling={n // 2: {atom}}, init={0})
+    result = check(ts, f"AF {atom}", native_binary=sys.executable)
+    assert result.decision.backend != "native"
+    assert "too long" in result.decision.reason
+    assert result.results == [True]
+    with pytest.raises(ValueError, match="too long"):
+        check(ts, f"AF {atom}", backend="native", native_binary=sys.executable)
+
+
+def test_out_of_range_labels_rule_out_native():
+    ts = ExplicitTransitionSystem(num_states=2, transitions=[(0, 1), (1, 1)], labeling={0: {"p"}, 5: {"q"}}, init={0})
+    decision = choose_backend(ts, "EF p", native_binary=sys.executable)
+    assert "native" not in decision.estimates
+    assert "outside the model" in decision.reason
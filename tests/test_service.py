@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.bddctl import TransitionSystem, CTLModelChecker
+from src.explicitctl import ExplicitTransitionSystem, ExplicitCTLModelChecker
+from src.service import ModelService, _WORKER_MODELS, _evict, _run_batch, check_batch
+
+
+BUILDS = []
+
+
+def build_checker():
+    BUILDS.append(1)
+    transitions = [(0, 1), (1, 1), (1, 2), (2, 2)]
+    labeling = {0: {"q"}, 1: {"q"}, 2: {"p"}}
+    return CTLModelChecker(TransitionSystem(num_states=3, transitions=transitions, labeling=labeling, init={0}))
+
+
+def build_explicit_checker():
+    ts = ExplicitTransitionSystem(num_states=2, transitions=[(0, 1), (1, 1)], labeling={0: {"q"}, 1: {"p"}}, init={0})
+    return ExplicitCTLModelChecker(ts)
+
+
+def test_check_batch_matches_satisfies():
+    formulas = ["E[q U p]", "A[q U p]", "EF p", "EF p AND EG q", "NOT"]
+    results = check_batch(build_checker(), formulas)
+    assert results[:4] == [("ok", True), ("ok", False), ("ok", True), ("ok", True)]
+    assert results[4][0] == "error"
+
+
+def test_concurrent_requests_are_coalesced():
+    async def run():
+        service = ModelService()
+        service.load("until", build_checker)
+        try:
+            return await asyncio.gather(
+                service.check("until", "E[q U p]"),
+                service.check("until", ["A[q U p]", "EF p"]),
+                service.check("until", "E[q U p]"),
+            ), service
+        finally:
+            service.close()
+
+    BUILDS.clear()
+    results, service = asyncio.run(run())
+    assert results == [[True], [False, True], [True]]
+    assert len(BUILDS) == 1
+    assert [m.batch_size for m in service.metrics] == [3, 3, 3]
+    assert service.latency_summary("until")["count"] == 3
+
+
+def test_model_is_built_once_across_batches():
+    async def run():
+        service = ModelService()
+        service.load("until", build_checker)
+        try:
+            await service.check("until", "EF p")
+            await service.check("until", "AG p")
+        finally:
+            service.close()
+
+    BUILDS.clear()
+    asyncio.run(run())
+    assert len(BUILDS) == 1
+
+
+def test_errors_are_reported_per_request():
+    async def run():
+        service = ModelService()
+        service.load("explicit", build_explicit_checker)
+        try:
+            good, bad = await asyncio.gather(
+                service.check("explicit", "EX p"),
+                service.check("explicit", "EX ("),
+                return_exceptions=True,
+            )
+            with pytest.raises(KeyError):
+                await service.check("missing", "EX p")
+            return good, bad, service.latency_summary("explicit")
+        finally:
+            service.close()
+
+    good, bad, summary = asyncio.run(run())
+    assert good == [True]
+    assert isinstance(bad, ValueError)
+    assert summary["count"] == 2
+    assert summary["errors"] == 1
+
+
+def test_unix_socket_and_http_roundtrip(tmp_path):
+    async def run():
+        service = ModelService()
+        service.load("explicit", build_explicit_checker)
+        path = str(tmp_path / "mc.sock")
+        unix_server = await service.start_unix_server(path)
+        http_server = await service.start_http_server()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(json.dumps({"model": "explicit", "formulas": ["EF p", "AG p"]}).encode() + b"\n")
+            unix_reply = json.loads(await reader.readline())
+            writer.close()
+
+            port = http_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"model": "explicit", "formulas": ["AF p"]}).encode()
+            writer.write(b"POST /check HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            http_reply = (await reader.read()).decode()
+            writer.close()
+            return unix_reply, http_reply
+        finally:
+            unix_server.close()
+            http_server.close()
+            service.close()
+
+    unix_reply, http_reply = asyncio.run(run())
+    assert unix_reply["results"] == [True, False]
+    assert unix_reply["latency_ms"] >= 0
+    assert http_reply.startswith("HTTP/1.1 200 OK")
+    assert json.loads(http_reply.split("\r\n\r\n", 1)[1])["results"] == [True]
+
+
+def broken_factory():
+    raise RuntimeError("model file missing")
+
+
+def test_factory_failure_is_reported_over_transports(tmp_path):
+    async def run():
+        service = ModelService()
+        service.load("broken", broken_factory)
+        path = str(tmp_path / "mc.sock")
+        unix_server = await service.start_unix_server(path)
+        http_server = await service.start_http_server()
+        try:
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(json.dumps({"model": "broken", "formulas": ["EF p"]}).encode() + b"\n")
+            unix_reply = json.loads(await reader.readline())
+            writer.close()
+
+            port = http_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            body = json.dumps({"model": "broken", "formulas": ["EF p"]}).encode()
+            writer.write(b"POST /check HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+            http_reply = (await reader.read()).decode()
+            writer.close()
+            return unix_reply, http_reply
+        finally:
+            unix_server.close()
+            http_server.close()
+            service.close()
+
+    unix_reply, http_reply = asyncio.run(run())
+    assert "model file missing" in unix_reply["error"]
+    assert http_reply.startswith("HTTP/1.1 500 Internal Server Error")
+    assert "model file missing" in json.loads(http_reply.split("\r\n\r\n", 1)[1])["error"]
+
+
+def test_many_models_build_concurrently():
+    async def run():
+        service = ModelService(max_workers=8)
+        names = [f"m{i}" for i in range(16)]
+        for name in names:
+            service.load(name, build_explicit_checker)
+        try:
+            for _ in range(3):
+                results = await asyncio.gather(*(service.check(name, "EF p") for name in names))
+                assert results == [[True]] * len(names)
+                for name in names:
+                    service.load(name, build_explicit_checker)
+        finally:
+            service.close()
+
+    asyncio.run(run())
+
+
+def test_stale_generation_does_not_evict_newer_model():
+    # After a reload the old generation can still be draining.
+    BUILDS.clear()
+    try:
+        assert _run_batch("token", "m", 2, build_checker, (), ["EF p"]) == [("ok", True)]
+        assert _run_batch("token", "m", 1, build_checker, (), ["EF p"]) == [("ok", True)]
+        assert _run_batch("token", "m", 2, build_checker, (), ["EF p"]) == [("ok", True)]
+        assert len(BUILDS) == 2
+        _run_batch("token", "m", 3, build_checker, (), ["EF p"])
+        assert [k for k in _WORKER_MODELS if k[0] == "token"] == [("token", "m", 3)]
+    finally:
+        _evict("token", "m")
+
+
+def test_bad_content_length_is_a_client_error():
+    async def run():
+        service = ModelService()
+        http_server = await service.start_http_server()
+        try:
+            port = http_server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"POST /check HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+            reply = (await reader.read()).decode()
+            writer.close()
+            return reply
+        finally:
+            http_server.close()
+            service.close()
+
+    reply = asyncio.run(run())
+    assert reply.startswith("HTTP/1.1 400 Bad Request")
+    assert "Content-Length" in json.loads(reply.split("\r\n\r\n", 1)[1])["error"]
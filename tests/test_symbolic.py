@@ -0,0 +1,127 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+from src.bddctl import CTLModelChecker
+from src.symbolic import Command, Module, SymbolicTransitionSystem
+
+
+def build_counter(limit=5):
+    """Counter that increments until ``limit`` and then stays there."""
+    counter = Module(
+        name="counter",
+        variables={"x": (0, limit)},
+        init="x = 0",
+        commands=[
+            Command(guard=f"x < {limit}", updates={"x": "x + 1"}),
+            Command(guard=f"x = {limit}"),
+        ],
+    )
+    return SymbolicTransitionSystem(modules=[counter], atoms={"done": f"x = {limit}", "zero": "x = 0"})
+
+
+def build_toggles(composition):
+    """Two modules, each flipping its own boolean."""
+    a = Module(name="a", variables={"a": bool}, init="NOT a",
+               commands=[Command(guard="TRUE", updates={"a": "NOT a"})])
+    b = Module(name="b", variables={"b": bool}, init="NOT b",
+               commands=[Command(guard="TRUE", updates={"b": "NOT b"})])
+    return SymbolicTransitionSystem(
+        modules=[a, b],
+        atoms={"same": "a = b", "a": "a", "b": "b"},
+        composition=composition,
+    )
+
+
+def test_counter_af_done():
+    mc = CTLModelChecker(build_counter())
+    assert mc.satisfies("AF done")
+    assert mc.satisfies("AG (done OR EX NOT zero)")
+
+
+def test_counter_ag_done_false():
+    mc = CTLModelChecker(build_counter())
+    assert not mc.satisfies("AG done")
+    assert not mc.satisfies("EF zero AND EX zero")
+
+
+def test_synchronous_keeps_toggles_equal():
+    mc = CTLModelChecker(build_toggles("synchronous"))
+    assert mc.satisfies("AG same")
+
+
+def test_interleaving_separates_toggles():
+    mc = CTLModelChecker(build_toggles("interleaving"))
+    assert not mc.satisfies("AG same")
+    assert mc.satisfies("EF (a AND NOT b)")
+
+
+def test_out_of_range_update_disables_command():
+    ts = SymbolicTransitionSystem(
+        modules=[Module(name="m", variables={"x": (1, 3)}, init="x = 3",
+                        commands=[Command(guard="TRUE", updates={"x": "x + 1"})])],
+        atoms={"three": "x = 3"},
+    )
+    mc = CTLModelChecker(ts)
+    assert not mc.satisfies("EX three")
+    assert mc.satisfies("AX NOT three")
+
+
+def test_valuation_roundtrip():
+    ts = build_toggles("interleaving")
+    init_states = [s for s in range(ts.num_states) if ts.state_bdd(s) <= ts.init]
+    assert [ts.valuation(s) for s in init_states] == [{"a": False, "b": False}]
+
+
+def test_update_of_foreign_variable_rejected():
+    a = Module(name="a", variables={"a": bool}, commands=[Command(guard="TRUE", updates={"b": "TRUE"})])
+    b = Module(name="b", variables={"b": bool}, commands=[])
+    with pytest.raises(ValueError):
+        SymbolicTransitionSystem(modules=[a, b])
+
+
+def test_bdd_variable_names_do_not_collide_with_user_names():
+    m = Module(name="m", variables={"x": (0, 3), "x_0": bool}, commands=[])
+    ts = SymbolicTransitionSystem(modules=[m])
+    assert ts.num_bits == 3
+    assert len(set(ts.state_vars + ts.next_vars)) == 6
+
+    a = Module(name="a", variables={"a": bool, "a_next": bool}, init="NOT a AND NOT a_next",
+               commands=[Command(guard="TRUE", updates={"a": "TRUE"})])
+    ts = SymbolicTransitionSystem(modules=[a], atoms={"a": "a", "an": "a_next"})
+    mc = CTLModelChecker(ts)
+    assert not mc.satisfies("EF an")
+    assert mc.satisfies("EF a")
+
+
+def test_wide_integer_ranges_compile_as_bit_vectors():
+    m = Module(
+        name="m",
+        variables={"x": (0, 1023), "y": (0, 1023)},
+        init="x = 0 AND y = 1000",
+        commands=[
+            Command(guard="x + y < 1023", updates={"x": "x + 1"}),
+            Command(guard="TRUE", updates={"y": "x - y + y"}),
+        ],
+    )
+    ts = SymbolicTransitionSystem(modules=[m], atoms={"sum": "x + y = 1001", "zero": "y = 0"})
+    mc = CTLModelChecker(ts)
+    assert mc.satisfies("EX sum AND EX zero")
+    assert ts.bdd.count(ts.ap_bdd("sum"), nvars=ts.num_bits) == 1002
+
+
+def test_integer_arithmetic_matches_enumeration():
+    m = Module(name="m", variables={"x": (-3, 4), "y": (2, 6)}, commands=[])
+    predicates = ["x - y >= -2", "x + y = 3", "-x < y - 5", "x - (y - x) != 0", "x + 0 <= -1"]
+    ts = SymbolicTransitionSystem(modules=[m], atoms={str(i): p for i, p in enumerate(predicates)})
+    values = [(x, y) for x in range(-3, 5) for y in range(2, 7)]
+    expected = [
+        sum(x - y >= -2 for x, y in values),
+        sum(x + y == 3 for x, y in values),
+        sum(-x < y - 5 for x, y in values),
+        sum(x - (y - x) != 0 for x, y in values),
+        sum(x <= -1 for x, y in values),
+    ]
+    counts = [ts.bdd.count(ts.ap_bdd(str(i)), nvars=ts.num_bits) for i in range(len(predicates))]
+    assert counts == expected